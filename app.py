@@ -3,14 +3,13 @@
 from __future__ import annotations
 
 import os
-import mimetypes
-import json
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional
 
-import pandas as pd
 from flask import (
+    Blueprint,
     Flask,
     abort,
     flash,
@@ -20,10 +19,14 @@ from flask import (
     render_template,
     request,
     session as flask_session,
+    send_file,
     send_from_directory,
     url_for,
 )
+from flask.json.provider import DefaultJSONProvider
+from flask.sessions import SecureCookieSessionInterface
 from flask_cors import CORS
+import plotly.io as pio
 from plotly.utils import PlotlyJSONEncoder
 from werkzeug.exceptions import HTTPException
 
@@ -37,9 +40,35 @@ from agents import (
 from utils.config import REPORTS_DIR
 from utils.session_manager import SessionManager
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional accelerator
+    orjson = None
+else:
+    pio.json.config.default_engine = "orjson"
+
 BASE_DIR = Path(__file__).parent
 STATIC_DIR = BASE_DIR / "static"
 TEMPLATES_DIR = BASE_DIR / "templates"
+STATIC_ROOT = str(STATIC_DIR.resolve())
+ASSET_CONTENT_TYPES = {
+    ".css": "text/css",
+    ".js": "application/javascript",
+    ".json": "application/json",
+    ".map": "application/json",
+    ".html": "text/html",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".ico": "image/vnd.microsoft.icon",
+    ".woff": "font/woff",
+    ".woff2": "font/woff2",
+    ".ttf": "font/ttf",
+}
+
+PLOTLY_ENCODER = PlotlyJSONEncoder()
 
 STAGE_TABS = [
     {"key": "upload", "label": "Upload"},
@@ -48,6 +77,43 @@ STAGE_TABS = [
     {"key": "visualize", "label": "Visualize"},
     {"key": "report", "label": "Report"},
 ]
+STAGE_KEYS = frozenset(tab["key"] for tab in STAGE_TABS)
+DEFAULT_STEP = STAGE_TABS[0]["key"]
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # Hand dates to default() so they keep Flask's HTTP-date format.
+        option = (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_SERIALIZE_NUMPY
+            | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
+class ApiSessionInterface(SecureCookieSessionInterface):
+    """Cookie sessions for HTML routes only.
+
+    JSON API calls are keyed on the X-Session-Id header, so they skip the
+    cookie decode/verify on the way in and the signing on the way out. Report
+    downloads under /api/reports/ are plain browser links and keep the
+    cookie as a fallback.
+    """
+
+    def open_session(self, app: Flask, request: Any):
+        path = request.path
+        if path.startswith("/api/") and not path.startswith("/api/reports/"):
+            return None
+        return super().open_session(app, request)
+
 
 app = Flask(
     __name__,
@@ -55,10 +121,20 @@ app = Flask(
     template_folder=str(TEMPLATES_DIR),
 )
 CORS(app, resources={r"/api/*": {"origins": "*"}})
+app.session_interface = ApiSessionInterface()
 app.secret_key = os.environ.get("FLASK_SECRET_KEY", "dev-secret-key")
+# Let a fronting server that honours X-Sendfile stream report files itself.
+app.use_x_sendfile = os.environ.get("USE_X_SENDFILE") == "1"
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 SESSION_COOKIE_KEY = "analytics_session_id"
 
+# HTML routes keep the cookie-backed Flask session; the JSON API is keyed
+# on the X-Session-Id header (see ApiSessionInterface).
+web_bp = Blueprint("web", __name__)
+api_bp = Blueprint("api", __name__, url_prefix="/api")
+
 
 def ensure_web_session() -> SessionManager:
     session_id = flask_session.get(SESSION_COOKIE_KEY)
@@ -86,74 +162,97 @@ def get_session_or_abort() -> SessionManager:
 
 
 def serialize_history(session: SessionManager) -> List[Dict[str, Any]]:
-    history: List[Dict[str, Any]] = []
-    for item in session.state.query_history:
-        result = item["result"]
-        if isinstance(result, pd.DataFrame):
-            summary: Dict[str, Any] = {
-                "type": "dataframe",
-                "rows": len(result),
-                "columns": list(result.columns),
-            }
-        elif isinstance(result, pd.Series):
-            summary = {
-                "type": "series",
-                "length": len(result),
-                "name": result.name,
-            }
-        elif isinstance(result, (int, float)):
-            summary = {"type": "scalar", "value": result}
-        else:
-            summary = {"type": "text", "value": str(result)}
-        history.append(
-            {
-                "timestamp": item["timestamp"],
-                "query": item["query"],
-                "explanation": item["explanation"],
-                "result_summary": summary,
-            }
-        )
-    return history
+    return [
+        {
+            "timestamp": item["timestamp"],
+            "query": item["query"],
+            "explanation": item["explanation"],
+            "result_summary": item["result_summary"],
+        }
+        for item in session.state.query_history
+    ]
 
 
-def build_cleaning_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "clean_missing": bool(payload.get("clean_missing", False)),
-        "missing_strategy": payload.get("missing_strategy"),
-        "missing_columns": payload.get("missing_columns") or [],
-        "clean_duplicates": bool(payload.get("clean_duplicates", True)),
-        "duplicate_strategy": payload.get("duplicate_strategy") or "drop",
-    }
+def parse_column_list(values: List[str]) -> List[str]:
+    """Flatten repeated and/or comma-separated form values into column names."""
+    return [col for col in map(str.strip, ",".join(values).split(",")) if col]
 
 
-def build_chart_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "chart_type": payload.get("chart_type"),
-        "x_col": payload.get("x_col"),
-        "y_col": payload.get("y_col"),
-    }
+@dataclass(slots=True)
+class CleaningRequest:
+    """Parsed cleaning options; the agent still takes them as a plain dict."""
 
+    clean_missing: bool = False
+    missing_strategy: Optional[str] = None
+    missing_columns: List[str] = field(default_factory=list)
+    clean_duplicates: bool = True
+    duplicate_strategy: str = "drop"
 
-def serialize_chart_payloads(charts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    serialized: List[Dict[str, Any]] = []
-    for chart in charts or []:
-        figure = chart.get("figure") or {}
+    @classmethod
+    def from_json(cls, payload: Dict[str, Any]) -> CleaningRequest:
+        return cls(
+            clean_missing=bool(payload.get("clean_missing", False)),
+            missing_strategy=payload.get("missing_strategy"),
+            missing_columns=payload.get("missing_columns") or [],
+            clean_duplicates=bool(payload.get("clean_duplicates", True)),
+            duplicate_strategy=payload.get("duplicate_strategy") or "drop",
+        )
+
+
+def encode_figure(figure: Any) -> str:
+    """Serialize a Plotly figure (or its dict form) to JSON, preferring orjson."""
+    if orjson is None:
+        return PLOTLY_ENCODER.encode(figure)
+    if isinstance(figure, dict):
         try:
-            figure_json = json.dumps(figure, cls=PlotlyJSONEncoder)
+            return orjson.dumps(figure, option=orjson.OPT_SERIALIZE_NUMPY).decode()
         except TypeError:
-            figure_json = json.dumps({"data": [], "layout": {}}, cls=PlotlyJSONEncoder)
-        serialized.append({**chart, "figure_json": figure_json})
-    return serialized
+            # Fall through so plotly can coerce pandas/datetime values first.
+            pass
+    return pio.to_json(figure, validate=False, engine="orjson")
+
+
+def chart_figure_json(chart: Dict[str, Any]) -> str:
+    figure = chart.get("figure") or {}
+    try:
+        return encode_figure(figure)
+    except TypeError:
+        return encode_figure({"data": [], "layout": {}})
+
+
+def cache_chart_json(charts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Encode each chart once so dashboard renders reuse the stored JSON."""
+    for chart in charts:
+        chart["figure_json"] = chart_figure_json(chart)
+    return charts
+
+
+def serialize_chart_payloads(charts: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        chart if "figure_json" in chart else {**chart, "figure_json": chart_figure_json(chart)}
+        for chart in charts or []
+    ]
+
+
+def get_cleaning_needs(session: SessionManager) -> Dict[str, Any]:
+    """Return cleaning needs, recomputing only when the current frame changes."""
+    df = session.state.current_dataframe
+    # The shape catches in-place row/column drops on the shared frame.
+    frame_key = (id(df), df.shape if df is not None else None)
+    cached_key, cached_needs = session.state.cleaning_needs_cache
+    if cached_key == frame_key:
+        return cached_needs
+    needs = session.get_agent(CleaningAgent).get_cleaning_needs()
+    session.state.cleaning_needs_cache = (frame_key, needs)
+    return needs
 
 
 def build_dashboard_context(session: SessionManager, current_step: str) -> Dict[str, Any]:
-    valid_steps = {tab["key"] for tab in STAGE_TABS}
-    if current_step not in valid_steps:
-        current_step = STAGE_TABS[0]["key"]
+    if current_step not in STAGE_KEYS:
+        current_step = DEFAULT_STEP
 
     summary = session.get_summary()
-    cleaning_agent = CleaningAgent(session)
-    cleaning_needs = cleaning_agent.get_cleaning_needs()
+    cleaning_needs = get_cleaning_needs(session)
 
     return {
         "stage_tabs": STAGE_TABS,
@@ -193,48 +292,46 @@ def handle_unexpected_exception(exc: Exception):
     raise exc
 
 
-@app.route("/")
+@web_bp.route("/")
 def serve_index():
     session = ensure_web_session()
-    current_step = request.args.get("step", STAGE_TABS[0]["key"])
+    current_step = request.args.get("step", DEFAULT_STEP)
     context = build_dashboard_context(session, current_step)
     return render_template("index.html", **context)
 
 
-@app.route("/assets/<path:filename>")
+@web_bp.route("/assets/<path:filename>")
 def serve_asset(filename: str):
-    assets_root = STATIC_DIR.resolve()
-    file_path = (assets_root / filename).resolve()
-    if not str(file_path).startswith(str(assets_root)):
-        abort(404, description="Asset not found")
-    if not file_path.exists():
+    candidate = os.path.normpath(os.path.join(STATIC_ROOT, filename))
+    if not candidate.startswith(STATIC_ROOT + os.sep) or not os.path.isfile(candidate):
         abort(404, description="Asset not found")
-    content_type, _ = mimetypes.guess_type(str(file_path))
     return send_from_directory(
-        str(assets_root),
-        str(file_path.relative_to(assets_root)),
-        mimetype=content_type or "application/octet-stream",
+        STATIC_ROOT,
+        os.path.relpath(candidate, STATIC_ROOT),
+        mimetype=ASSET_CONTENT_TYPES.get(
+            os.path.splitext(candidate)[1].lower(), "application/octet-stream"
+        ),
     )
 
 
-@app.route("/session/reset", methods=["POST"])
+@web_bp.route("/session/reset", methods=["POST"])
 def reset_web_session():
     flask_session.pop(SESSION_COOKIE_KEY, None)
     ensure_web_session()
     flash("Session reinitialized", "success")
-    return redirect(url_for("serve_index"))
+    return redirect(url_for("web.serve_index"))
 
 
-@app.route("/upload", methods=["POST"])
+@web_bp.route("/upload", methods=["POST"])
 def upload_step():
     session = ensure_web_session()
     file_storage = request.files.get("file")
     if file_storage is None or file_storage.filename == "":
         flash("Please select a file to upload.", "error")
-        return redirect(url_for("serve_index", step="upload"))
+        return redirect(url_for("web.serve_index", step="upload"))
 
     file_bytes = file_storage.read()
-    agent = InputAgent(session)
+    agent = session.get_agent(InputAgent)
     result = agent.execute(file_bytes, file_storage.filename, len(file_bytes))
     if not result["success"]:
         flash(result["message"], "error")
@@ -242,89 +339,87 @@ def upload_step():
         session.state.dataset_preview = result.get("preview", {})
         session.state.cleaning_summary = {}
         session.state.last_query_result = {}
-        session.state.chart_payloads = []
+        session.state.chart_payloads.clear()
         session.state.report_status = {}
         flash(result["message"], "success")
-    return redirect(url_for("serve_index", step="upload"))
+    return redirect(url_for("web.serve_index", step="upload"))
 
 
-@app.route("/clean", methods=["POST"])
+@web_bp.route("/clean", methods=["POST"])
 def clean_step():
     session = ensure_web_session()
-    payload = {
-        "clean_missing": True,
-        "missing_strategy": request.form.get("missing_strategy"),
-        "missing_columns": [col.strip() for col in (request.form.get("missing_columns") or "").split(",") if col.strip()],
-        "clean_duplicates": bool(request.form.get("handle_duplicates")),
-        "duplicate_strategy": "drop" if request.form.get("handle_duplicates") else "keep",
-    }
-    agent = CleaningAgent(session)
-    result = agent.execute(payload)
+    handle_duplicates = bool(request.form.get("handle_duplicates"))
+    cleaning_request = CleaningRequest(
+        clean_missing=True,
+        missing_strategy=request.form.get("missing_strategy"),
+        missing_columns=parse_column_list(request.form.getlist("missing_columns")),
+        clean_duplicates=handle_duplicates,
+        duplicate_strategy="drop" if handle_duplicates else "keep",
+    )
+    agent = session.get_agent(CleaningAgent)
+    result = agent.execute(asdict(cleaning_request))
     if not result["success"]:
         flash(result["message"], "error")
     else:
         session.state.cleaning_summary = result.get("summary", {})
         flash(result["message"], "success")
-    return redirect(url_for("serve_index", step="clean"))
+    return redirect(url_for("web.serve_index", step="clean"))
 
 
-@app.route("/query", methods=["POST"])
+@web_bp.route("/query", methods=["POST"])
 def query_step():
     session = ensure_web_session()
     query_text = (request.form.get("query") or "").strip()
     if not query_text:
         flash("Enter a natural language question first.", "error")
-        return redirect(url_for("serve_index", step="query"))
-    agent = NLQAgent(session)
+        return redirect(url_for("web.serve_index", step="query"))
+    agent = session.get_agent(NLQAgent)
     result = agent.execute(query_text)
     if not result["success"]:
         flash(result["message"], "error")
     else:
         session.state.last_query_result = result
         flash("Query executed successfully.", "success")
-    return redirect(url_for("serve_index", step="query"))
+    return redirect(url_for("web.serve_index", step="query"))
 
 
-@app.route("/visualize/auto", methods=["POST"])
+@web_bp.route("/visualize/auto", methods=["POST"])
 def auto_visualize_step():
     session = ensure_web_session()
-    agent = VisualizationAgent(session)
+    agent = session.get_agent(VisualizationAgent)
     result = agent.execute(auto=True)
     if not result["success"]:
         flash(result["message"], "error")
     else:
-        session.state.chart_payloads = result.get("charts", []) + session.state.chart_payloads
+        charts = cache_chart_json(result.get("charts", []))
+        session.state.chart_payloads.extendleft(reversed(charts))
         flash(result["message"], "success")
-    return redirect(url_for("serve_index", step="visualize"))
+    return redirect(url_for("web.serve_index", step="visualize"))
 
 
-@app.route("/visualize/custom", methods=["POST"])
+@web_bp.route("/visualize/custom", methods=["POST"])
 def custom_visualize_step():
     session = ensure_web_session()
-    payload = {
-        "chart_type": request.form.get("chart_type"),
-        "x_col": (request.form.get("x_col") or "").strip(),
-        "y_col": (request.form.get("y_col") or "").strip() or None,
-    }
-    agent = VisualizationAgent(session)
+    agent = session.get_agent(VisualizationAgent)
     result = agent.execute(
-        chart_type=payload["chart_type"],
-        x_col=payload["x_col"],
-        y_col=payload["y_col"],
+        chart_type=request.form.get("chart_type"),
+        x_col=(request.form.get("x_col") or "").strip(),
+        y_col=(request.form.get("y_col") or "").strip() or None,
         auto=False,
     )
     if not result["success"]:
         flash(result["message"], "error")
     else:
-        session.state.chart_payloads = result.get("charts", []) + session.state.chart_payloads
+        charts = cache_chart_json(result.get("charts", []))
+        session.state.chart_payloads.extendleft(reversed(charts))
         flash(result["message"], "success")
-    return redirect(url_for("serve_index", step="visualize"))
+    return redirect(url_for("web.serve_index", step="visualize"))
 
 
-@app.route("/report", methods=["POST"])
+@web_bp.route("/report", methods=["POST"])
 def report_step():
     session = ensure_web_session()
-    agent = ReportAgent(session)
+    agent = session.get_agent(ReportAgent)
     result = agent.execute()
     if not result["success"]:
         flash(result["message"], "error")
@@ -334,110 +429,110 @@ def report_step():
             "generated_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC"),
         }
         flash("Report generated successfully.", "success")
-    return redirect(url_for("serve_index", step="report"))
+    return redirect(url_for("web.serve_index", step="report"))
 
 
-@app.route("/reset", methods=["POST"])
+@web_bp.route("/reset", methods=["POST"])
 def reset_data_step():
     session = ensure_web_session()
     session.reset_session()
     flash("Session data cleared.", "success")
-    return redirect(url_for("serve_index", step="upload"))
+    return redirect(url_for("web.serve_index", step="upload"))
 
 
-@app.route("/api/session", methods=["POST"])
+@api_bp.route("/session", methods=["POST"])
 def create_session():
     session_id = SessionManager.create_session()
     return jsonify({"session_id": session_id})
 
 
-@app.route("/api/reset", methods=["POST"])
+@api_bp.route("/reset", methods=["POST"])
 def reset_session():
     session = get_session_or_abort()
     session.reset_session()
     return jsonify({"success": True})
 
 
-@app.route("/api/summary")
+@api_bp.route("/summary")
 def get_summary():
     session = get_session_or_abort()
     return jsonify(session.get_summary())
 
 
-@app.route("/api/upload", methods=["POST"])
+@api_bp.route("/upload", methods=["POST"])
 def upload_file():
     session = get_session_or_abort()
     file_storage = request.files.get("file")
     if file_storage is None or file_storage.filename == "":
         abort(400, description="File is required")
     file_bytes = file_storage.read()
-    agent = InputAgent(session)
+    agent = session.get_agent(InputAgent)
     result = agent.execute(file_bytes, file_storage.filename, len(file_bytes))
     if not result["success"]:
         abort(400, description=result["message"])
     return jsonify(result)
 
 
-@app.route("/api/cleaning/needs")
+@api_bp.route("/cleaning/needs")
 def cleaning_needs():
     session = get_session_or_abort()
-    agent = CleaningAgent(session)
-    return jsonify(agent.get_cleaning_needs())
+    return jsonify(get_cleaning_needs(session))
 
 
-@app.route("/api/clean", methods=["POST"])
+@api_bp.route("/clean", methods=["POST"])
 def clean_data():
     session = get_session_or_abort()
     payload = request.get_json(silent=True) or {}
-    agent = CleaningAgent(session)
-    result = agent.execute(build_cleaning_payload(payload))
+    agent = session.get_agent(CleaningAgent)
+    result = agent.execute(asdict(CleaningRequest.from_json(payload)))
     if not result["success"]:
         abort(400, description=result["message"])
     return jsonify(result)
 
 
-@app.route("/api/query", methods=["POST"])
+@api_bp.route("/query", methods=["POST"])
 def run_query():
     session = get_session_or_abort()
     payload = request.get_json(silent=True) or {}
     query_text = (payload.get("query") or "").strip()
     if not query_text:
         abort(400, description="Query text is required")
-    agent = NLQAgent(session)
+    agent = session.get_agent(NLQAgent)
     result = agent.execute(query_text)
     if not result["success"]:
         abort(400, description=result["message"])
     return jsonify(result)
 
 
-@app.route("/api/history")
+@api_bp.route("/history")
 def query_history():
     session = get_session_or_abort()
     return jsonify(serialize_history(session))
 
 
-@app.route("/api/visualize/auto", methods=["POST"])
+@api_bp.route("/visualize/auto", methods=["POST"])
 def auto_visualize():
     session = get_session_or_abort()
-    agent = VisualizationAgent(session)
+    agent = session.get_agent(VisualizationAgent)
     result = agent.execute(auto=True)
     if not result["success"]:
         abort(400, description=result["message"])
     return jsonify(result)
 
 
-@app.route("/api/visualize/custom", methods=["POST"])
+@api_bp.route("/visualize/custom", methods=["POST"])
 def custom_visualize():
     session = get_session_or_abort()
     payload = request.get_json(silent=True) or {}
-    chart_payload = build_chart_payload(payload)
-    if not chart_payload["chart_type"] or not chart_payload["x_col"]:
+    chart_type = payload.get("chart_type")
+    x_col = payload.get("x_col")
+    if not chart_type or not x_col:
         abort(400, description="Chart type and X column are required")
-    agent = VisualizationAgent(session)
+    agent = session.get_agent(VisualizationAgent)
     result = agent.execute(
-        chart_type=chart_payload["chart_type"],
-        x_col=chart_payload["x_col"],
-        y_col=chart_payload["y_col"],
+        chart_type=chart_type,
+        x_col=x_col,
+        y_col=payload.get("y_col"),
         auto=False,
     )
     if not result["success"]:
@@ -445,7 +540,7 @@ def custom_visualize():
     return jsonify(result)
 
 
-@app.route("/api/charts")
+@api_bp.route("/charts")
 def list_charts():
     session = get_session_or_abort()
     charts = [
@@ -459,37 +554,64 @@ def list_charts():
     return jsonify(charts)
 
 
-@app.route("/api/report", methods=["POST"])
+@api_bp.route("/report", methods=["POST"])
 def generate_report():
     session = get_session_or_abort()
-    agent = ReportAgent(session)
+    agent = session.get_agent(ReportAgent)
     result = agent.execute()
     if not result["success"]:
         abort(400, description=result["message"])
     return jsonify(result)
 
 
-@app.route("/reports/<path:filename>")
-@app.route("/api/reports/<path:filename>")
-def download_report(filename: str):
-    resolve_session_from_request()
+def send_report(filename: str):
     reports_root = REPORTS_DIR.resolve()
     report_path = (reports_root / filename).resolve()
-    if not str(report_path).startswith(str(reports_root)):
+    if not report_path.is_relative_to(reports_root) or not report_path.is_file():
         abort(404, description="Report not found")
-    if not report_path.exists():
-        abort(404, description="Report not found")
-    return send_from_directory(
-        str(reports_root),
-        report_path.name,
+    return send_file(
+        str(report_path),
         mimetype="application/pdf",
         as_attachment=True,
+        conditional=True,
     )
 
 
+@web_bp.route("/reports/<path:filename>")
+def download_report(filename: str):
+    resolve_session_from_request()
+    return send_report(filename)
+
+
+@api_bp.route("/reports/<path:filename>")
+def download_report_api(filename: str):
+    resolve_session_from_request()
+    return send_report(filename)
+
+
+app.register_blueprint(web_bp)
+app.register_blueprint(api_bp)
+
+
+def run_asgi(port: int) -> None:
+    """Serve the app from uvicorn's event loop (uvloop when installed).
+
+    a2wsgi runs each Flask view on its own pool of ASGI_THREADS worker
+    threads, so slow uploads and downloads do not block other requests.
+    """
+    import uvicorn
+    from a2wsgi import WSGIMiddleware
+
+    workers = int(os.environ.get("ASGI_THREADS", 10))
+    uvicorn.run(WSGIMiddleware(app, workers=workers), host="0.0.0.0", port=port, loop="auto")
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
-    debug_env = os.environ.get("FLASK_DEBUG")
-    debug = True if debug_env is None else debug_env == "1"
-    use_reloader = os.environ.get("FLASK_USE_RELOADER", "0") == "1"
-    app.run(host="0.0.0.0", port=port, debug=debug, use_reloader=use_reloader)
+    if os.environ.get("USE_ASGI") == "1":
+        run_asgi(port)
+    else:
+        debug_env = os.environ.get("FLASK_DEBUG")
+        debug = True if debug_env is None else debug_env == "1"
+        use_reloader = os.environ.get("FLASK_USE_RELOADER", "0") == "1"
+        app.run(host="0.0.0.0", port=port, debug=debug, use_reloader=use_reloader)
@@ -14,7 +14,7 @@ GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")  # Default Groq
 
 # File Upload Limits
 MAX_FILE_SIZE_MB = 200
-ALLOWED_EXTENSIONS = ['.csv', '.xlsx', '.xls']
+ALLOWED_EXTENSIONS = frozenset({'.csv', '.xlsx', '.xls'})
 
 # Data Processing
 MISSING_VALUE_STRATEGIES = {
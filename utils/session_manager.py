@@ -2,17 +2,27 @@
 
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional, Tuple
 import pandas as pd
 import threading
+import time
 import uuid
 
 
 @dataclass
 class SessionState:
-    """Container for per-session data objects."""
+    """Container for per-session data objects.
+
+    Writes must go through the ``SessionManager`` helpers (``set_dataframe``,
+    ``add_*``): they bump ``summary_version``, which ``get_summary`` uses to
+    decide whether its cached counts are stale; appending to the lists here
+    directly leaves those counts stale. The current DataFrame is shared by
+    reference and may be edited in place; raw and cleaned frames are
+    private copies.
+    """
 
     raw_dataframe: Optional[pd.DataFrame] = None
     cleaned_dataframe: Optional[pd.DataFrame] = None
@@ -31,22 +41,78 @@ class SessionState:
     dataset_preview: Dict[str, Any] = field(default_factory=dict)
     cleaning_summary: Dict[str, Any] = field(default_factory=dict)
     last_query_result: Dict[str, Any] = field(default_factory=dict)
-    chart_payloads: List[Dict[str, Any]] = field(default_factory=list)
+    chart_payloads: Deque[Dict[str, Any]] = field(default_factory=deque)
     report_status: Dict[str, Any] = field(default_factory=dict)
+    agents: Dict[str, Any] = field(default_factory=dict)
+    cleaning_needs_cache: Tuple[Any, Dict[str, Any]] = (None, {})
+    summary_version: int = 0
+    summary_cache: Tuple[int, Optional[Dict[str, Any]]] = (-1, None)
+
+
+# Bursts of log writes usually land within the same second.
+_last_formatted: Tuple[int, str] = (-1, '')
+
+
+def format_timestamp(timestamp: float) -> str:
+    """Render a stored ``time.time()`` value as ``YYYY-MM-DD HH:MM:SS``."""
+    global _last_formatted
+    second = int(timestamp)
+    cached_second, cached_text = _last_formatted
+    if cached_second == second:
+        return cached_text
+    text = datetime.fromtimestamp(second).strftime('%Y-%m-%d %H:%M:%S')
+    _last_formatted = (second, text)
+    return text
+
+
+def summarize_result(result: Any) -> Dict[str, Any]:
+    """Build the JSON-friendly summary shown for a query history entry."""
+    if isinstance(result, pd.DataFrame):
+        return {
+            'type': 'dataframe',
+            'rows': len(result),
+            'columns': list(result.columns),
+        }
+    if isinstance(result, pd.Series):
+        return {
+            'type': 'series',
+            'length': len(result),
+            'name': result.name,
+        }
+    if isinstance(result, (int, float)):
+        return {'type': 'scalar', 'value': result}
+    return {'type': 'text', 'value': str(result)}
 
 
 class SessionManager:
-    """Thread-safe session store for API consumers."""
+    """Thread-safe session store for API consumers.
+
+    Sessions are spread over ``_SHARD_COUNT`` stripes, each guarded by its
+    own lock, so requests for unrelated sessions never contend. Locks only
+    guard mutations of a shard (inserting, removing or replacing a
+    ``SessionState``); lookups read the shard dict directly, which is
+    atomic under the GIL.
+    """
 
-    _sessions: Dict[str, SessionState] = {}
-    _lock = threading.Lock()
+    _SHARD_COUNT = 32
+    _shards: List[Tuple[threading.Lock, Dict[str, SessionState]]] = [
+        (threading.Lock(), {}) for _ in range(_SHARD_COUNT)
+    ]
 
     def __init__(self, session_id: str):
         self.session_id = session_id
-        with SessionManager._lock:
-            if session_id not in SessionManager._sessions:
-                SessionManager._sessions[session_id] = SessionState()
-        self.state = SessionManager._sessions[session_id]
+        lock, sessions = SessionManager._shard(session_id)
+        state = sessions.get(session_id)
+        if state is None:
+            with lock:
+                state = sessions.get(session_id)
+                if state is None:
+                    state = sessions[session_id] = SessionState()
+        self.state = state
+
+    @classmethod
+    def _shard(cls, session_id: str) -> Tuple[threading.Lock, Dict[str, SessionState]]:
+        return cls._shards[hash(session_id) % cls._SHARD_COUNT]
 
     # ------------------------------------------------------------------
     # Session lifecycle helpers
@@ -55,29 +121,47 @@ class SessionManager:
     def create_session(cls) -> str:
         """Create and register a new session identifier."""
         session_id = uuid.uuid4().hex
-        with cls._lock:
-            cls._sessions[session_id] = SessionState()
+        lock, sessions = cls._shard(session_id)
+        with lock:
+            sessions[session_id] = SessionState()
         return session_id
 
     @classmethod
     def delete_session(cls, session_id: str):
         """Remove session from store if present."""
-        with cls._lock:
-            cls._sessions.pop(session_id, None)
+        lock, sessions = cls._shard(session_id)
+        with lock:
+            sessions.pop(session_id, None)
 
     @classmethod
     def has_session(cls, session_id: str) -> bool:
-        return session_id in cls._sessions
+        _, sessions = cls._shard(session_id)
+        return session_id in sessions
 
     # ------------------------------------------------------------------
     # Dataframe helpers
     # ------------------------------------------------------------------
-    def set_dataframe(self, df: pd.DataFrame, df_type: str = 'current'):
+    def set_dataframe(self, df: pd.DataFrame, df_type: str = 'current', copy: bool = False):
+        """Store ``df`` as the current frame (and as raw/cleaned if requested).
+
+        The current frame is shared with the caller by reference; pass
+        ``copy=True`` if the caller keeps mutating ``df``. Raw and cleaned
+        snapshots get one copy of their own, so edits made through
+        ``get_dataframe()`` cannot rewrite them.
+        """
+        if copy:
+            df = df.copy()
         if df_type == 'raw':
-            self.state.raw_dataframe = df.copy()
+            self.state.raw_dataframe = df if copy else df.copy()
         elif df_type == 'cleaned':
-            self.state.cleaned_dataframe = df.copy()
-        self.state.current_dataframe = df.copy()
+            self.state.cleaned_dataframe = df if copy else df.copy()
+        self.state.current_dataframe = df
+        self.state.summary_version += 1
+        # id() values can be recycled once the previous frame is freed, so
+        # the identity check alone cannot be trusted across replacements.
+        self.state.cleaning_needs_cache = (None, {})
+        # Agents may have inspected the previous frame when constructed.
+        self.state.agents = {}
 
     def get_dataframe(self, df_type: str = 'current') -> Optional[pd.DataFrame]:
         if df_type == 'raw':
@@ -86,38 +170,66 @@ class SessionManager:
             return self.state.cleaned_dataframe
         return self.state.current_dataframe
 
+    # ------------------------------------------------------------------
+    # Agent helpers
+    # ------------------------------------------------------------------
+    def get_agent(self, agent_cls: type) -> Any:
+        """Return this session's ``agent_cls`` instance, creating it on demand.
+
+        Instances are shared by every request on the session, including
+        concurrent ones, until ``set_dataframe`` drops them. Agents must
+        therefore not keep per-call mutable state on ``self``.
+        """
+        agent = self.state.agents.get(agent_cls.__name__)
+        if agent is None:
+            agent = self.state.agents[agent_cls.__name__] = agent_cls(self)
+        return agent
+
     # ------------------------------------------------------------------
     # Logging helpers
     # ------------------------------------------------------------------
     def add_cleaning_log(self, action: str, details: str):
+        now = time.time()
         self.state.cleaning_log.append({
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'timestamp': format_timestamp(now),
+            'created_at': now,
             'action': action,
             'details': details
         })
+        self.state.summary_version += 1
 
     def add_query(self, query: str, result: Any, explanation: str):
+        now = time.time()
         self.state.query_history.append({
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'timestamp': format_timestamp(now),
+            'created_at': now,
             'query': query,
             'result': result,
+            'result_summary': summarize_result(result),
             'explanation': explanation
         })
+        self.state.summary_version += 1
 
     def add_chart(self, chart_obj: Any, chart_type: str, title: str):
+        now = time.time()
         self.state.generated_charts.append({
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'timestamp': format_timestamp(now),
+            'created_at': now,
             'chart': chart_obj,
             'type': chart_type,
             'title': title
         })
+        self.state.summary_version += 1
 
     def add_insight(self, insight: str, category: str = 'general'):
+        now = time.time()
         self.state.insights.append({
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'timestamp': format_timestamp(now),
+            'created_at': now,
             'text': insight,
             'category': category
         })
+        self.state.summary_version += 1
 
     # ------------------------------------------------------------------
     # Metadata helpers
@@ -138,18 +250,27 @@ class SessionManager:
         return self.state.uploaded_file_info
 
     def reset_session(self):
-        SessionManager._sessions[self.session_id] = SessionState()
-        self.state = SessionManager._sessions[self.session_id]
+        lock, sessions = SessionManager._shard(self.session_id)
+        with lock:
+            self.state = sessions[self.session_id] = SessionState()
 
     def get_summary(self) -> Dict[str, Any]:
+        version, counts = self.state.summary_cache
+        if counts is None or version != self.state.summary_version:
+            counts = {
+                'cleaning_operations': len(self.state.cleaning_log),
+                'queries_executed': len(self.state.query_history),
+                'charts_generated': len(self.state.generated_charts),
+                'insights_count': len(self.state.insights)
+            }
+            self.state.summary_cache = (self.state.summary_version, counts)
+        # The shape is read live: the current frame may be edited in place.
         df = self.state.current_dataframe
+        rows, columns = df.shape if df is not None else (0, 0)
         return {
             'has_data': df is not None,
-            'rows': len(df) if df is not None else 0,
-            'columns': len(df.columns) if df is not None else 0,
-            'cleaning_operations': len(self.state.cleaning_log),
-            'queries_executed': len(self.state.query_history),
-            'charts_generated': len(self.state.generated_charts),
-            'insights_count': len(self.state.insights)
+            'rows': rows,
+            'columns': columns,
+            **counts
         }
 
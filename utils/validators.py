@@ -1,21 +1,189 @@
 
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from typing import Tuple
-from pathlib import Path
+from functools import lru_cache
+from itertools import compress
+from typing import Callable, Collection, FrozenSet, Optional, Tuple
+
+try:
+    from numba import config as numba_config, njit, prange, set_num_threads
+except ImportError:  # numba is optional; the pandas path handles every frame
+    njit = None
+
+# Operations a natural language query should never smuggle in
+DANGEROUS_KEYWORDS = (
+    'drop table', 'delete from', 'truncate',
+    'insert into', 'update set', 'exec',
+    'system', 'os.', 'eval(', 'exec('
+)
+# One group per keyword, so a match maps back to its DANGEROUS_KEYWORDS entry
+_DANGEROUS_RE = re.compile(
+    '|'.join(f'({re.escape(keyword)})' for keyword in DANGEROUS_KEYWORDS), re.IGNORECASE
+)
+
+
+# Shared success results; only failures need a freshly formatted message
+_EXT_OK = (True, "Valid file extension")
+_QUERY_OK = (True, "Valid query")
+_SAFE_OK = (True, "Query is safe")
+_DATAFRAME_OK = (True, "DataFrame is valid")
+_COLUMN_EXISTS_OK = (True, "Column exists")
+_NUMERIC_OK = (True, "Column is numeric")
+
+# Below this many cells the JIT-compiled scan is not worth dispatching to
+NUMBA_MIN_CELLS = 1_000_000
+# Each prange worker holds a float64 copy of its column plus a hash table of
+# ~2x rows slots (~25 bytes per row in total), so peak scratch memory is
+# about NUMBA_MAX_THREADS * rows * 25 bytes on top of the frame itself.
+NUMBA_MAX_THREADS = 4
+# numba's fallback "workqueue" threading layer aborts the process when two
+# threads enter a parallel kernel at once, and Flask views run on threads;
+# scans are serialized so any layer is safe.
+_NUMBA_LOCK = threading.Lock()
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _scan_float_columns(values):
+        """Per-column NaN counts and non-NaN distinct counts in one pass.
+
+        Distinct values are counted with an open-addressing hash set over
+        the float bit patterns, one table per column.
+        """
+        n_rows, n_cols = values.shape
+        nan_counts = np.zeros(n_cols, dtype=np.int64)
+        unique_counts = np.zeros(n_cols, dtype=np.int64)
+        bits = 1
+        while (1 << bits) < 2 * n_rows:
+            bits += 1
+        size = 1 << bits
+        shift = np.uint64(64 - bits)
+        golden = np.uint64(0x9E3779B97F4A7C15)
+        for j in prange(n_cols):
+            column = np.empty(n_rows, dtype=np.float64)
+            for i in range(n_rows):
+                column[i] = values[i, j] + 0.0  # folds -0.0 into 0.0
+            keys = column.view(np.uint64)
+            table = np.empty(size, dtype=np.uint64)
+            used = np.zeros(size, dtype=np.bool_)
+            nans = 0
+            distinct = 0
+            for i in range(n_rows):
+                if column[i] != column[i]:
+                    nans += 1
+                    continue
+                key = keys[i]
+                slot = np.int64((key * golden) >> shift)
+                while used[slot]:
+                    if table[slot] == key:
+                        break
+                    slot = (slot + 1) & (size - 1)
+                else:
+                    used[slot] = True
+                    table[slot] = key
+                    distinct += 1
+            nan_counts[j] = nans
+            unique_counts[j] = distinct
+        return nan_counts, unique_counts
+else:
+    _scan_float_columns = None
+
+
+def _scan_numeric_frame(df: pd.DataFrame) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Run the fused numba scan on large all-float64 frames.
+
+    Returns ``None`` when numba is unavailable or the frame does not qualify,
+    in which case callers fall back to the pandas reductions.
+    """
+    if _scan_float_columns is None or df.size < NUMBA_MIN_CELLS:
+        return None
+    if not (df.dtypes == np.float64).all():
+        return None
+    values = df.to_numpy()
+    with _NUMBA_LOCK:
+        # set_num_threads is thread-local, so it is applied per call
+        set_num_threads(min(NUMBA_MAX_THREADS, numba_config.NUMBA_NUM_THREADS))
+        return _scan_float_columns(values)
+
+
+# Wide, long frames split their per-column reductions across threads; the
+# NumPy/hashtable kernels release the GIL for most of the work on numeric
+# and datetime columns. Object columns hold the GIL, so they stay serial.
+PARALLEL_MIN_COLUMNS = 64
+PARALLEL_MIN_ROWS = 10_000
+_SCAN_WORKERS = os.cpu_count() or 1
+# Threads are only spawned on first submit
+_SCAN_POOL = ThreadPoolExecutor(max_workers=_SCAN_WORKERS, thread_name_prefix='issue-scan')
+
+
+def _use_parallel_scan(df: pd.DataFrame) -> bool:
+    rows, columns = df.shape
+    if not (_SCAN_WORKERS > 1 and columns > PARALLEL_MIN_COLUMNS and rows > PARALLEL_MIN_ROWS):
+        return False
+    return all(isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM' for dtype in df.dtypes.tolist())
+
+
+def _reduce_column_chunks(df: pd.DataFrame, reducer: Callable[[pd.DataFrame], np.ndarray]) -> np.ndarray:
+    """Apply ``reducer`` to contiguous column slices on the shared pool and concatenate."""
+    bounds = np.linspace(0, df.shape[1], _SCAN_WORKERS + 1).astype(int).tolist()
+    futures = [
+        _SCAN_POOL.submit(reducer, df.iloc[:, start:stop])
+        for start, stop in zip(bounds, bounds[1:]) if stop > start
+    ]
+    return np.concatenate([future.result() for future in futures])
+
+
+def _count_missing(df: pd.DataFrame) -> np.ndarray:
+    return df.isna().values.sum(axis=0)
+
+
+def _count_unique(df: pd.DataFrame) -> np.ndarray:
+    return df.nunique().values
+
+
+@lru_cache(maxsize=128)
+def _dtype_name(dtype) -> str:
+    """Interned display name so columns sharing a dtype share one string."""
+    return sys.intern(str(dtype))
+
+
+# File-extension checks are pure functions of a small set of filenames, so
+# results are memoized; the public staticmethod delegates to these.
+def _file_suffix(filename: str) -> str:
+    """Lowercased extension of the last path component, like ``Path.suffix``."""
+    name = filename.rpartition('/')[2]
+    idx = name.rfind('.')
+    return name[idx:].lower() if idx > 0 else ''
+
+
+@lru_cache(maxsize=64)
+def _allowed_extensions_label(allowed_extensions: FrozenSet[str]) -> str:
+    return ', '.join(sorted(allowed_extensions))
+
+
+@lru_cache(maxsize=512)
+def _validate_file_extension(filename: str, allowed_extensions: FrozenSet[str]) -> Tuple[bool, str]:
+    file_ext = _file_suffix(filename)
+    
+    if file_ext not in allowed_extensions:
+        return False, f"Invalid file type. Allowed: {_allowed_extensions_label(allowed_extensions)}"
+    
+    return _EXT_OK
 
 
 class DataValidator:
     """Validates uploaded data and user inputs"""
     
     @staticmethod
-    def validate_file_extension(filename: str, allowed_extensions: list) -> Tuple[bool, str]:
+    def validate_file_extension(filename: str, allowed_extensions: Collection[str]) -> Tuple[bool, str]:
         """Validate file extension"""
-        file_ext = Path(filename).suffix.lower()
-        
-        if file_ext not in allowed_extensions:
-            return False, f"Invalid file type. Allowed: {', '.join(allowed_extensions)}"
-        
-        return True, "Valid file extension"
+        if not isinstance(allowed_extensions, frozenset):
+            allowed_extensions = frozenset(allowed_extensions)
+        return _validate_file_extension(filename, allowed_extensions)
     
     @staticmethod
     def validate_file_size(file_size: int, max_size_mb: int) -> Tuple[bool, str]:
@@ -27,50 +195,70 @@ class DataValidator:
         
         return True, f"File size OK ({size_mb:.2f} MB)"
     
+    @staticmethod
+    def validate_file_sizes(file_sizes, max_size_mb: int) -> np.ndarray:
+        """Validate a batch of file sizes (bytes); True where within the limit"""
+        return np.asarray(file_sizes) <= max_size_mb * 1024 * 1024
+    
     @staticmethod
     def validate_dataframe(df: pd.DataFrame) -> Tuple[bool, str]:
         """Validate DataFrame structure"""
         if df is None:
             return False, "DataFrame is None"
         
-        if df.empty:
-            return False, "DataFrame is empty"
+        rows, columns = df.shape
         
-        if len(df.columns) == 0:
+        if columns == 0:
             return False, "No columns found"
         
-        if len(df) == 0:
+        if rows == 0:
             return False, "No rows found"
         
-        return True, "DataFrame is valid"
+        return _DATAFRAME_OK
     
     @staticmethod
     def detect_data_issues(df: pd.DataFrame) -> dict:
         """Detect common data quality issues"""
         issues = {
             'missing_values': {},
+            'missing_cols': [],
+            'missing_counts': [],
             'duplicates': 0,
             'data_types': {},
             'warnings': []
         }
+        columns = df.columns.tolist()
+        numeric_scan = _scan_numeric_frame(df)
+        parallel_scan = numeric_scan is None and _use_parallel_scan(df)
         
-        # Missing values
-        missing = df.isnull().sum()
-        issues['missing_values'] = {
-            col: int(count) for col, count in missing.items() if count > 0
-        }
+        # Missing values (one mask, reused for the warning total below)
+        counts = None
+        if numeric_scan is not None:
+            counts = numeric_scan[0]
+        elif parallel_scan:
+            counts = _reduce_column_chunks(df, _count_missing)
+        else:
+            missing_mask = df.isna().values
+            if missing_mask.any():
+                counts = missing_mask.sum(axis=0)
+        total_missing = int(counts.sum()) if counts is not None else 0
+        if total_missing > 0:
+            # Parallel column/count lists; the dict view shares their objects
+            has_missing = np.flatnonzero(counts)
+            issues['missing_cols'] = df.columns.values[has_missing].tolist()
+            issues['missing_counts'] = counts[has_missing].tolist()
+            issues['missing_values'] = dict(zip(issues['missing_cols'], issues['missing_counts']))
         
         # Duplicates
-        issues['duplicates'] = int(df.duplicated().sum())
+        duplicate_mask = df.duplicated().values
+        if duplicate_mask.any():
+            issues['duplicates'] = int(duplicate_mask.sum())
         
         # Data types
-        issues['data_types'] = {
-            col: str(dtype) for col, dtype in df.dtypes.items()
-        }
+        issues['data_types'] = dict(zip(columns, map(_dtype_name, df.dtypes.tolist())))
         
         # Warnings
-        if len(issues['missing_values']) > 0:
-            total_missing = sum(issues['missing_values'].values())
+        if total_missing > 0:
             issues['warnings'].append(
                 f"Found {total_missing} missing values across {len(issues['missing_values'])} columns"
             )
@@ -81,11 +269,17 @@ class DataValidator:
             )
         
         # Check for very high cardinality (potential ID columns)
-        for col in df.columns:
-            if df[col].nunique() == len(df) and len(df) > 100:
-                issues['warnings'].append(
-                    f"Column '{col}' has unique values (possible ID field)"
-                )
+        if len(df) > 100:
+            if numeric_scan is not None:
+                unique_counts = numeric_scan[1]
+            elif parallel_scan:
+                unique_counts = _reduce_column_chunks(df, _count_unique)
+            else:
+                unique_counts = df.nunique().values
+            issues['warnings'].extend(
+                f"Column '{col}' has unique values (possible ID field)"
+                for col in compress(columns, unique_counts == len(df))
+            )
         
         return issues
     
@@ -95,18 +289,24 @@ class DataValidator:
         if column not in df.columns:
             return False, f"Column '{column}' not found. Available: {list(df.columns)}"
         
-        return True, "Column exists"
+        return _COLUMN_EXISTS_OK
     
     @staticmethod
     def validate_numeric_column(df: pd.DataFrame, column: str) -> Tuple[bool, str]:
         """Check if column is numeric"""
-        if column not in df.columns:
+        dtype = df.dtypes.get(column)
+        if dtype is None:
             return False, f"Column '{column}' not found"
         
-        if not pd.api.types.is_numeric_dtype(df[column]):
-            return False, f"Column '{column}' is not numeric (type: {df[column].dtype})"
+        if isinstance(dtype, np.dtype):
+            is_numeric = dtype.kind in 'biufc'
+        else:
+            # pandas extension dtypes (Int64, Float64, boolean, ...)
+            is_numeric = getattr(dtype, '_is_numeric', False)
+        if not is_numeric:
+            return False, f"Column '{column}' is not numeric (type: {dtype})"
         
-        return True, "Column is numeric"
+        return _NUMERIC_OK
     
     @staticmethod
     def validate_categorical_column(df: pd.DataFrame, column: str, max_unique: int = 50) -> Tuple[bool, str]:
@@ -128,30 +328,24 @@ class QueryValidator:
     @staticmethod
     def validate_query(query: str) -> Tuple[bool, str]:
         """Basic query validation"""
-        if not query or query.strip() == "":
+        # isspace() scans in place, unlike strip(), which copies the query
+        if not query or query.isspace():
             return False, "Query cannot be empty"
         
-        if len(query) < 3:
+        length = len(query)
+        if length < 3:
             return False, "Query too short (minimum 3 characters)"
         
-        if len(query) > 500:
+        if length > 500:
             return False, "Query too long (maximum 500 characters)"
         
-        return True, "Valid query"
+        return _QUERY_OK
     
     @staticmethod
     def is_safe_query(query: str) -> Tuple[bool, str]:
         """Check for potentially harmful operations"""
-        dangerous_keywords = [
-            'drop table', 'delete from', 'truncate', 
-            'insert into', 'update set', 'exec',
-            'system', 'os.', 'eval(', 'exec('
-        ]
-        
-        query_lower = query.lower()
-        
-        for keyword in dangerous_keywords:
-            if keyword in query_lower:
-                return False, f"Query contains potentially dangerous operation: '{keyword}'"
+        match = _DANGEROUS_RE.search(query)
+        if match:
+            return False, f"Query contains potentially dangerous operation: '{DANGEROUS_KEYWORDS[match.lastindex - 1]}'"
         
-        return True, "Query is safe"
+        return _SAFE_OK